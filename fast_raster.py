@@ -0,0 +1,120 @@
+"""Numba-JITted software rasterizer for shaded STL previews.
+
+Renders flat-shaded triangles with a Z-buffer into an RGB image, taking
+the mesh as separate x/y/z vertex arrays plus a face-index array so the
+hot loops work over contiguous float32 data. Used by
+generate_stl_previews as a fast 3D path when no GPU renderer is
+available.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+# Base color matches the matplotlib path's 'lightsteelblue'
+BASE_COLOR = np.array([176, 196, 222], dtype=np.float32)
+
+# Coverage lookup indexed by the three edge functions' sign bits; only
+# index 0 (all non-negative) is inside the triangle
+_COVER_LUT = np.array([1, 0, 0, 0, 0, 0, 0, 0], dtype=np.uint8)
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _raster_kernel(px, py, depth, faces, colors, width, height):
+    """Rasterize screen-space triangles with a Z-buffer
+
+    px/py are pixel coordinates per vertex, depth is distance along the
+    view axis (larger = closer), colors is one RGB row per face.
+    """
+    image = np.full((height, width, 3), 255, np.uint8)
+    zbuf = np.full((height, width), np.float32(-1e30), np.float32)
+
+    for f in range(faces.shape[0]):
+        i0, i1, i2 = faces[f, 0], faces[f, 1], faces[f, 2]
+        x0, y0, z0 = px[i0], py[i0], depth[i0]
+        x1, y1, z1 = px[i1], py[i1], depth[i1]
+        x2, y2, z2 = px[i2], py[i2], depth[i2]
+
+        # Normalize winding so the edge functions are positive inside
+        area = (x1 - x0) * (y2 - y0) - (y1 - y0) * (x2 - x0)
+        if area == 0.0:
+            continue
+        if area < 0.0:
+            x1, y1, z1, x2, y2, z2 = x2, y2, z2, x1, y1, z1
+            area = -area
+
+        xmin = max(int(min(x0, min(x1, x2))), 0)
+        xmax = min(int(max(x0, max(x1, x2))) + 1, width - 1)
+        ymin = max(int(min(y0, min(y1, y2))), 0)
+        ymax = min(int(max(y0, max(y1, y2))) + 1, height - 1)
+        if xmin > xmax or ymin > ymax:
+            continue
+
+        inv_area = 1.0 / area
+        r = colors[f, 0]
+        g = colors[f, 1]
+        b = colors[f, 2]
+
+        # Scanlines of one triangle touch disjoint rows, so they can
+        # run in parallel without racing on the Z-buffer
+        for y in prange(ymin, ymax + 1):
+            cy = y + 0.5
+            for x in range(xmin, xmax + 1):
+                cx = x + 0.5
+                w0 = (x2 - x1) * (cy - y1) - (y2 - y1) * (cx - x1)
+                w1 = (x0 - x2) * (cy - y2) - (y0 - y2) * (cx - x2)
+                w2 = (x1 - x0) * (cy - y0) - (y1 - y0) * (cx - x0)
+                # Branchless coverage + depth test: pack the edge sign
+                # bits into a LUT index and fold the Z comparison into
+                # an arithmetic select, so the inner loop has no
+                # unpredictable branch at triangle edges
+                sign_bits = ((w0 < 0.0) * 1) | ((w1 < 0.0) * 2) | ((w2 < 0.0) * 4)
+                z = (w0 * z0 + w1 * z1 + w2 * z2) * inv_area
+                take = np.float32(_COVER_LUT[sign_bits] & np.uint8(z > zbuf[y, x]))
+                keep = np.float32(1.0) - take
+                zbuf[y, x] = take * z + keep * zbuf[y, x]
+                image[y, x, 0] = np.uint8(take * r + keep * image[y, x, 0])
+                image[y, x, 1] = np.uint8(take * g + keep * image[y, x, 1])
+                image[y, x, 2] = np.uint8(take * b + keep * image[y, x, 2])
+
+    return image
+
+def rasterize(verts_x, verts_y, verts_z, faces, width, height,
+              light_dir=(0.3, 0.5, 0.8), elev=20.0, azim=45.0):
+    """Render a mesh to a (height, width, 3) uint8 image
+
+    Uses an orthographic camera on the same isometric axis as the
+    matplotlib view (elev/azim in degrees) and per-face flat shading
+    against light_dir.
+    """
+    elev_r, azim_r = np.radians(elev), np.radians(azim)
+    view = np.array([np.cos(elev_r) * np.cos(azim_r),
+                     np.cos(elev_r) * np.sin(azim_r),
+                     np.sin(elev_r)], dtype=np.float32)
+    right = np.cross([0.0, 0.0, 1.0], view)
+    right = (right / np.linalg.norm(right)).astype(np.float32)
+    up = np.cross(view, right).astype(np.float32)
+
+    verts = np.stack([verts_x, verts_y, verts_z], axis=1).astype(np.float32)
+    sx = verts @ right
+    sy = verts @ up
+    depth = verts @ view
+
+    # Fit the projected mesh into the viewport with a 5% margin
+    span = max(sx.max() - sx.min(), sy.max() - sy.min(), 1e-12)
+    scale = 0.9 * min(width, height) / span
+    px = ((sx - (sx.min() + sx.max()) * 0.5) * scale + width * 0.5).astype(np.float32)
+    py = ((sy.min() + sy.max()) * 0.5 - sy) * scale + height * 0.5
+    py = py.astype(np.float32)
+
+    # Flat shading: per-face normal against the light direction
+    light = np.asarray(light_dir, dtype=np.float32)
+    light = light / np.linalg.norm(light)
+    tri = verts[faces]
+    normals = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    np.clip(lengths, 1e-12, None, out=lengths)
+    intensity = np.abs((normals / lengths) @ light)
+    colors = (BASE_COLOR * (0.35 + 0.65 * intensity[:, None])).astype(np.float32)
+
+    return _raster_kernel(px, py, depth.astype(np.float32),
+                          np.ascontiguousarray(faces, dtype=np.int64),
+                          colors, width, height)
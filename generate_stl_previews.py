@@ -1,42 +1,336 @@
 import os
 import sys
 import time
+import json
+import mmap
+import shutil
+import hashlib
 import argparse
+import concurrent.futures
 import numpy as np
-from PIL import Image, ImageDraw
+from PIL import Image, ImageDraw, ImageFont
 import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+from matplotlib.collections import LineCollection, PolyCollection
 from mpl_toolkits.mplot3d import Axes3D
 import trimesh
 from tqdm import tqdm
 from datetime import datetime
 
+# Use EGL so pyrender can create a GL context without a display server
+os.environ.setdefault('PYOPENGL_PLATFORM', 'egl')
+try:
+    import pyrender
+except ImportError:
+    pyrender = None
+
+try:
+    import fast_raster
+except ImportError:
+    fast_raster = None
+
+try:
+    import meshoptimizer
+except ImportError:
+    meshoptimizer = None
+
+try:
+    import pyvista
+except ImportError:
+    pyvista = None
+
 def log_info(message):
     """Print formatted log message with timestamp"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] {message}")
 
+def hash_stl_file(stl_path):
+    """Compute a SHA-256 content hash of an STL file via mmap"""
+    try:
+        with open(stl_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return hashlib.sha256(mm).hexdigest()
+    except (OSError, ValueError):
+        return None
+
+def load_stl_fast(stl_path):
+    """Parse an STL straight from a memory-mapped file
+
+    Hands trimesh's STL parser the mapping itself instead of going
+    through its buffered file pipeline, so bytes come straight from the
+    page cache without an extra copy. Raises on malformed files; the
+    caller falls back to trimesh.load_mesh.
+    """
+    with open(stl_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            kwargs = trimesh.exchange.stl.load_stl(mm)
+            # Multi-solid ASCII STLs come back as a dict of per-body
+            # kwargs; concatenate them like trimesh.load_mesh would
+            if 'geometry' in kwargs:
+                return trimesh.util.concatenate(
+                    [trimesh.Trimesh(process=False, **body)
+                     for body in kwargs['geometry'].values()])
+            return trimesh.Trimesh(process=False, **kwargs)
+
+def reorder_faces(faces, vertex_count):
+    """Reorder faces for vertex-cache locality (Forsyth's algorithm)
+
+    Successive triangles then tend to share vertices, which cuts cache
+    misses in the per-face render paths. Returns the faces unchanged
+    when the optional meshoptimizer backend is not installed.
+    """
+    if meshoptimizer is None:
+        return faces
+    indices = np.ascontiguousarray(faces, dtype=np.uint32).ravel()
+    reordered = np.empty_like(indices)
+    meshoptimizer.optimize_vertex_cache(reordered, indices,
+                                        len(indices), vertex_count)
+    return reordered.reshape(-1, 3).astype(faces.dtype)
+
+def load_preview_cache(cache_path):
+    """Load the hash -> preview filename cache, or an empty dict"""
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
 class STLPreviewGenerator:
-    def __init__(self, image_size=(512, 512)):
+    # Wireframe plotting cost scales with edge count, so it gets a
+    # tighter face budget than the shaded methods
+    WIREFRAME_FACE_BUDGET = 5000
+
+    # Layout constants for the simple bounding-box preview
+    SIMPLE_MARGIN = 50
+    SIMPLE_TEXT_OFFSETS = (100, 80, 60, 40)
+
+    # Face-count thresholds for auto strategy selection: plot_trisurf
+    # is only reasonable on small meshes, and the wireframe stops being
+    # readable (and affordable) well before a million faces
+    MATPLOTLIB_FACE_LIMIT = 5000
+    WIREFRAME_FACE_LIMIT = 100000
+
+    def __init__(self, image_size=(512, 512), cache_path=None, max_faces=20000,
+                 image_format='png', strategy='auto'):
         self.image_size = image_size
-        self.success_count = 0
-        self.failure_count = 0
-        self.skipped_count = 0
-        
-    def generate_preview_matplotlib(self, stl_path, output_path):
+        self.max_faces = max_faces
+        self.image_format = image_format
+        self.strategy = strategy
+        self._renderer = None
+        self._plotter = None
+        self._fig_3d = None
+        self._ax_3d = None
+        self._fig_2d = None
+        self._ax_2d = None
+        # Precomputed steelblue fade used for the corner accents in the
+        # simple preview, built once instead of 60 draw.line calls per file
+        alphas = (255 * (1 - np.arange(30) / 30)).astype(np.uint8)
+        gradient = np.zeros((30, 30, 4), dtype=np.uint8)
+        gradient[..., :3] = (70, 130, 180)
+        gradient[..., 3] = alphas[np.newaxis, :]
+        self._corner_gradient = Image.fromarray(gradient, 'RGBA')
+        # Resolve the font and label rows once instead of per draw.text call
+        self._font = ImageFont.load_default()
+        self._text_rows = tuple(self.image_size[1] - self.SIMPLE_MARGIN - offset
+                                for offset in self.SIMPLE_TEXT_OFFSETS)
+        # Thumbnails don't need the full zlib compression search: a low
+        # fixed PNG level (or WEBP's fastest method) halves encode time
+        if image_format == 'webp':
+            self._pil_save_kwargs = {'quality': 80, 'method': 0}
+        else:
+            self._pil_save_kwargs = {'compress_level': 1, 'optimize': False}
+        # Read-only snapshot of previously rendered content hashes;
+        # new entries are collected by the caller and persisted once
+        self._hash_cache = load_preview_cache(cache_path) if cache_path else {}
+
+    def _select_methods(self, mesh):
+        """Pick which render methods to try for this mesh, in order
+
+        The hardware/raster paths are cheap at any size and always come
+        first; the face count only decides how expensive a
+        matplotlib-based fallback is still worth attempting.
+        """
+        if self.strategy == '3d':
+            return ('pyrender', 'pyvista', 'raster', 'matplotlib')
+        if self.strategy == 'wire':
+            return ('wireframe',)
+        if self.strategy == 'simple':
+            return ('simple',)
+
+        face_count = len(mesh.faces)
+        if face_count < self.MATPLOTLIB_FACE_LIMIT:
+            return ('pyrender', 'pyvista', 'raster', 'matplotlib',
+                    'wireframe', 'simple')
+        if face_count < self.WIREFRAME_FACE_LIMIT:
+            return ('pyrender', 'pyvista', 'raster', 'wireframe', 'simple')
+        return ('pyrender', 'pyvista', 'raster', 'simple')
+
+    def _save_image(self, img, output_path):
+        """Save a PIL image with the cheap encoder settings"""
+        img.save(output_path, format=self.image_format.upper(),
+                **self._pil_save_kwargs)
+
+    def _decimate(self, mesh, face_budget):
+        """Reduce the mesh to a face budget; returns the original on failure"""
+        if not face_budget or len(mesh.faces) <= face_budget:
+            return mesh
+        try:
+            decimated = mesh.simplify_quadric_decimation(face_count=face_budget)
+            log_info(f"Decimated mesh: {len(mesh.faces):,} -> {len(decimated.faces):,} faces")
+            return decimated
+        except Exception as e:
+            log_info(f"Decimation unavailable ({str(e)}), rendering full mesh")
+            return mesh
+
+    def _figure_size_inches(self):
+        """Figure size that renders exactly image_size pixels at dpi=100"""
+        return (self.image_size[0] / 100, self.image_size[1] / 100)
+
+    def _get_3d_axes(self):
+        """Return the reusable 3D figure/axes, cleared for the next mesh"""
+        if self._fig_3d is None:
+            self._fig_3d = plt.figure(figsize=self._figure_size_inches(),
+                                      dpi=100, facecolor='white')
+            self._ax_3d = self._fig_3d.add_subplot(111, projection='3d')
+            self._fig_3d.subplots_adjust(left=0, right=1, bottom=0, top=1)
+        else:
+            self._ax_3d.clear()
+        return self._fig_3d, self._ax_3d
+
+    def _get_2d_axes(self):
+        """Return the reusable 2D figure/axes, cleared for the next mesh"""
+        if self._fig_2d is None:
+            self._fig_2d, self._ax_2d = plt.subplots(
+                1, 1, figsize=self._figure_size_inches(), dpi=100,
+                facecolor='white')
+            self._fig_2d.subplots_adjust(left=0, right=1, bottom=0, top=1)
+        else:
+            self._ax_2d.clear()
+        return self._fig_2d, self._ax_2d
+
+    def _get_renderer(self):
+        """Lazily create one OffscreenRenderer shared across all files"""
+        if self._renderer is None:
+            self._renderer = pyrender.OffscreenRenderer(
+                viewport_width=self.image_size[0],
+                viewport_height=self.image_size[1])
+        return self._renderer
+
+    def generate_preview_pyrender(self, mesh, stl_path, output_path):
+        """Generate preview using GPU-accelerated offscreen rendering"""
+        if pyrender is None:
+            return False
+
+        try:
+            log_info(f"Attempting GPU preview for: {os.path.basename(stl_path)}")
+
+            scene = pyrender.Scene(bg_color=[255, 255, 255, 255],
+                                   ambient_light=[0.3, 0.3, 0.3])
+            scene.add(pyrender.Mesh.from_trimesh(mesh, smooth=False))
+
+            # Place the camera on the same isometric-like axis as the
+            # matplotlib view (elev=20, azim=45), backed off far enough
+            # to contain the bounding sphere; trimesh caches .bounds
+            lo, hi = mesh.bounds
+            center = (lo + hi) * 0.5
+            max_range = (hi - lo).max() * 0.5
+            elev, azim = np.radians(20), np.radians(45)
+            direction = np.array([np.cos(elev) * np.cos(azim),
+                                  np.cos(elev) * np.sin(azim),
+                                  np.sin(elev)])
+            distance = max(max_range, 1e-6) * 3.0
+            eye = center + direction * distance
+
+            # Build a look-at pose (camera looks down -Z)
+            forward = (eye - center) / np.linalg.norm(eye - center)
+            right = np.cross([0.0, 0.0, 1.0], forward)
+            right /= np.linalg.norm(right)
+            up = np.cross(forward, right)
+            pose = np.eye(4)
+            pose[:3, 0] = right
+            pose[:3, 1] = up
+            pose[:3, 2] = forward
+            pose[:3, 3] = eye
+
+            camera = pyrender.PerspectiveCamera(yfov=np.pi / 4.0)
+            scene.add(camera, pose=pose)
+            light = pyrender.DirectionalLight(color=np.ones(3), intensity=3.0)
+            scene.add(light, pose=pose)
+
+            color, _ = self._get_renderer().render(scene)
+            self._save_image(Image.fromarray(color), output_path)
+
+            return True
+
+        except Exception as e:
+            log_info(f"GPU rendering failed: {str(e)}")
+            return False
+
+    def _get_plotter(self):
+        """Lazily create one off-screen PyVista plotter shared across files"""
+        if self._plotter is None:
+            self._plotter = pyvista.Plotter(off_screen=True,
+                                            window_size=list(self.image_size))
+        else:
+            self._plotter.clear()
+        return self._plotter
+
+    def generate_preview_pyvista(self, mesh, stl_path, output_path):
+        """Generate preview using VTK's native renderer via PyVista"""
+        if pyvista is None:
+            return False
+
+        try:
+            log_info(f"Attempting VTK preview for: {os.path.basename(stl_path)}")
+
+            plotter = self._get_plotter()
+            plotter.set_background('white')
+            plotter.add_mesh(pyvista.wrap(mesh), color='lightsteelblue',
+                             show_edges=True, edge_color='darkblue',
+                             line_width=0.5)
+            plotter.camera_position = 'iso'
+            self._save_image(Image.fromarray(plotter.screenshot()), output_path)
+
+            return True
+
+        except Exception as e:
+            log_info(f"VTK rendering failed: {str(e)}")
+            return False
+
+    def generate_preview_raster(self, mesh, stl_path, output_path):
+        """Generate preview using the Numba software rasterizer"""
+        if fast_raster is None:
+            return False
+
+        try:
+            log_info(f"Attempting raster preview for: {os.path.basename(stl_path)}")
+
+            # SoA layout: one contiguous float32 array per coordinate
+            vertices = mesh.vertices.astype(np.float32)
+            image = fast_raster.rasterize(
+                np.ascontiguousarray(vertices[:, 0]),
+                np.ascontiguousarray(vertices[:, 1]),
+                np.ascontiguousarray(vertices[:, 2]),
+                mesh.faces,
+                self.image_size[0], self.image_size[1])
+            self._save_image(Image.fromarray(image), output_path)
+
+            return True
+
+        except Exception as e:
+            log_info(f"Raster rendering failed: {str(e)}")
+            return False
+
+    def generate_preview_matplotlib(self, mesh, stl_path, output_path):
         """Generate preview using matplotlib 3D plotting"""
         try:
             log_info(f"Attempting 3D preview for: {os.path.basename(stl_path)}")
+
+            # Reuse the worker's figure so Axes3D setup is paid once
+            fig, ax = self._get_3d_axes()
             
-            # Load the STL mesh
-            mesh = trimesh.load_mesh(stl_path)
-            
-            # Create figure with white background
-            fig = plt.figure(figsize=(8, 8), facecolor='white')
-            ax = fig.add_subplot(111, projection='3d')
-            
-            # Get mesh vertices and faces
-            vertices = mesh.vertices
+            # Get mesh vertices and faces; float32 halves the memory
+            # traffic through matplotlib's transform pipeline
+            vertices = mesh.vertices.astype(np.float32, copy=False)
             faces = mesh.faces
             
             # Plot the mesh surface
@@ -44,15 +338,12 @@ class STLPreviewGenerator:
                            triangles=faces, alpha=0.8, shade=True, 
                            color='lightsteelblue', edgecolor='darkblue', linewidth=0.1)
             
-            # Set equal aspect ratio and good viewing angle
-            max_range = np.array([vertices[:,0].max()-vertices[:,0].min(),
-                                vertices[:,1].max()-vertices[:,1].min(),
-                                vertices[:,2].max()-vertices[:,2].min()]).max() / 2.0
-            
-            mid_x = (vertices[:,0].max()+vertices[:,0].min()) * 0.5
-            mid_y = (vertices[:,1].max()+vertices[:,1].min()) * 0.5
-            mid_z = (vertices[:,2].max()+vertices[:,2].min()) * 0.5
-            
+            # Set equal aspect ratio and good viewing angle; trimesh's
+            # cached .bounds replaces six full passes over the vertices
+            lo, hi = mesh.bounds
+            mid_x, mid_y, mid_z = (lo + hi) * 0.5
+            max_range = (hi - lo).max() / 2.0
+
             ax.set_xlim(mid_x - max_range, mid_x + max_range)
             ax.set_ylim(mid_y - max_range, mid_y + max_range)
             ax.set_zlim(mid_z - max_range, mid_z + max_range)
@@ -72,71 +363,74 @@ class STLPreviewGenerator:
             ax.yaxis.pane.set_edgecolor('w')
             ax.zaxis.pane.set_edgecolor('w')
             
-            # Save the figure
-            plt.savefig(output_path, dpi=self.image_size[0]//8, bbox_inches='tight', 
-                       facecolor='white', edgecolor='none', pad_inches=0.1)
-            plt.close(fig)
-            
+            # Grab the rendered Agg buffer and save it through PIL
+            # directly, skipping savefig's format-dispatch path; the
+            # figure is already sized to image_size pixels and stays
+            # open for the next file
+            fig.canvas.draw()
+            buf = np.asarray(fig.canvas.buffer_rgba())
+            self._save_image(Image.fromarray(buf).convert('RGB'), output_path)
+
             return True
             
         except Exception as e:
             log_info(f"Matplotlib 3D rendering failed: {str(e)}")
             return False
 
-    def generate_preview_wireframe(self, stl_path, output_path):
+    def generate_preview_wireframe(self, mesh, stl_path, output_path):
         """Generate a 2D wireframe preview"""
         try:
             log_info(f"Attempting wireframe preview for: {os.path.basename(stl_path)}")
+
+            mesh = self._decimate(mesh, self.WIREFRAME_FACE_BUDGET)
+
+            # Reuse the worker's figure so backend setup is paid once
+            fig, ax = self._get_2d_axes()
             
-            # Load the STL mesh
-            mesh = trimesh.load_mesh(stl_path)
-            
-            # Create figure
-            fig, ax = plt.subplots(1, 1, figsize=(8, 8), facecolor='white')
-            
-            # Project 3D vertices to 2D (isometric-like projection)
-            vertices = mesh.vertices
+            # Project 3D vertices to 2D (isometric-like projection);
+            # float32 keeps the projection and collections light
+            vertices = mesh.vertices.astype(np.float32, copy=False)
             proj_matrix = np.array([[1, 0, 0.5],
-                                   [0, 1, 0.5]])
+                                   [0, 1, 0.5]], dtype=np.float32)
             vertices_2d = np.dot(vertices, proj_matrix.T)
             
-            # Plot edges
-            for face in mesh.faces:
-                triangle = vertices_2d[face]
-                triangle_closed = np.vstack([triangle, triangle[0]])
-                ax.plot(triangle_closed[:, 0], triangle_closed[:, 1], 
-                       'steelblue', alpha=0.6, linewidth=0.3)
-            
-            # Fill some faces for better visualization
-            for face in mesh.faces[::5]:  # Every 5th face
-                triangle = vertices_2d[face]
-                poly = patches.Polygon(triangle, alpha=0.3, facecolor='lightsteelblue', 
-                                     edgecolor='steelblue', linewidth=0.3)
-                ax.add_patch(poly)
-            
+            # Plot all unique edges with a single collection instead of
+            # one ax.plot call per triangle
+            faces = mesh.faces
+            edges = np.sort(np.stack([faces[:, [0, 1]],
+                                      faces[:, [1, 2]],
+                                      faces[:, [2, 0]]], axis=1).reshape(-1, 2), axis=1)
+            edges = np.unique(edges, axis=0)
+            segments = vertices_2d[edges]
+            ax.add_collection(LineCollection(segments, colors='steelblue',
+                                             alpha=0.6, linewidths=0.3))
+
+            # Fill some faces for better visualization (every 5th face),
+            # again batched into one collection
+            ax.add_collection(PolyCollection(vertices_2d[faces[::5]], alpha=0.3,
+                                             facecolors='lightsteelblue',
+                                             edgecolors='steelblue', linewidths=0.3))
+
             ax.set_aspect('equal')
+            ax.autoscale_view()
             ax.axis('off')
             ax.set_facecolor('white')
             
-            plt.tight_layout()
-            plt.savefig(output_path, dpi=self.image_size[0]//8, bbox_inches='tight',
-                       facecolor='white', edgecolor='none', pad_inches=0.1)
-            plt.close(fig)
-            
+            fig.canvas.draw()
+            buf = np.asarray(fig.canvas.buffer_rgba())
+            self._save_image(Image.fromarray(buf).convert('RGB'), output_path)
+
             return True
             
         except Exception as e:
             log_info(f"Wireframe rendering failed: {str(e)}")
             return False
 
-    def generate_preview_simple(self, stl_path, output_path):
+    def generate_preview_simple(self, mesh, stl_path, output_path):
         """Generate a very simple bounding box preview as fallback"""
         try:
             log_info(f"Attempting simple preview for: {os.path.basename(stl_path)}")
-            
-            # Load the STL mesh
-            mesh = trimesh.load_mesh(stl_path)
-            
+
             # Create a simple image
             img = Image.new('RGB', self.image_size, 'white')
             draw = ImageDraw.Draw(img)
@@ -147,30 +441,28 @@ class STLPreviewGenerator:
             face_count = len(mesh.faces) if hasattr(mesh, 'faces') else 0
             
             # Draw bounding box
-            margin = 50
+            margin = self.SIMPLE_MARGIN
             box_coords = [margin, margin, self.image_size[0]-margin, self.image_size[1]-margin]
             draw.rectangle(box_coords, outline='steelblue', width=3)
             
-            # Add 3D effect
-            for offset in range(30):
-                alpha = int(255 * (1 - offset/30))
-                draw.line([margin+offset, margin-offset, margin+offset+1, margin-offset],
-                         fill=(70, 130, 180, alpha))
-                draw.line([self.image_size[0]-margin+offset, margin-offset,
-                          self.image_size[0]-margin+offset+1, margin-offset],
-                         fill=(70, 130, 180, alpha))
+            # Add 3D effect: paste the precomputed fade at both top corners
+            img.paste(self._corner_gradient, (margin, margin - 30),
+                     mask=self._corner_gradient)
+            img.paste(self._corner_gradient, (self.image_size[0] - margin, margin - 30),
+                     mask=self._corner_gradient)
             
-            # Add text info
+            # Add text info with the cached font and precomputed rows
             filename = os.path.basename(stl_path)
-            draw.text((margin, self.image_size[1]-margin-100), f"File: {filename}", fill='black')
-            draw.text((margin, self.image_size[1]-margin-80), f"Faces: {face_count:,}", fill='black')
-            draw.text((margin, self.image_size[1]-margin-60), f"Volume: {volume:.2f} units³", fill='black')
-            draw.text((margin, self.image_size[1]-margin-40),
-                     f"Size: {abs(bounds[1][0]-bounds[0][0]):.2f} x "
-                     f"{abs(bounds[1][1]-bounds[0][1]):.2f} x "
-                     f"{abs(bounds[1][2]-bounds[0][2]):.2f} units", fill='black')
+            labels = (f"File: {filename}",
+                      f"Faces: {face_count:,}",
+                      f"Volume: {volume:.2f} units³",
+                      f"Size: {abs(bounds[1][0]-bounds[0][0]):.2f} x "
+                      f"{abs(bounds[1][1]-bounds[0][1]):.2f} x "
+                      f"{abs(bounds[1][2]-bounds[0][2]):.2f} units")
+            for row, label in zip(self._text_rows, labels):
+                draw.text((margin, row), label, fill='black', font=self._font)
             
-            img.save(output_path)
+            self._save_image(img, output_path)
             return True
             
         except Exception as e:
@@ -178,83 +470,222 @@ class STLPreviewGenerator:
             return False
 
     def generate_preview(self, stl_path, output_path):
-        """Try multiple rendering methods in order of preference"""
+        """Try multiple rendering methods in order of preference
+
+        Returns a (status, content_hash) tuple where status is 'success',
+        'failed', 'skipped' or 'cached', so callers can aggregate counts
+        and cache entries across worker processes.
+        """
         if os.path.exists(output_path):
             log_info(f"Preview already exists, skipping: {os.path.basename(stl_path)}")
-            self.skipped_count += 1
-            return
-            
-        success = False
-        
-        # Try each method in order
-        if self.generate_preview_matplotlib(stl_path, output_path):
-            success = True
-            log_info("✓ 3D preview generated successfully")
-        elif self.generate_preview_wireframe(stl_path, output_path):
-            success = True
-            log_info("✓ Wireframe preview generated successfully")
-        elif self.generate_preview_simple(stl_path, output_path):
-            success = True
-            log_info("✓ Simple preview generated successfully")
-            
-        if success:
-            self.success_count += 1
-        else:
-            self.failure_count += 1
-            log_info(f"❌ All rendering methods failed for: {os.path.basename(stl_path)}")
+            return 'skipped', None
 
-def find_stl_files(base_path):
-    """Find all STL files recursively"""
+        # Identical STL content seen before (duplicates are common in
+        # 3D-print libraries): copy the existing preview instead of
+        # re-rendering
+        file_hash = hash_stl_file(stl_path)
+        if file_hash is not None:
+            cached_name = self._hash_cache.get(file_hash)
+            # Only reuse a preview in the requested output format; a
+            # cache built with another --format falls through to a
+            # fresh render rather than mislabeling the copied bytes
+            if cached_name and (os.path.splitext(cached_name)[1]
+                                == os.path.splitext(output_path)[1]):
+                cached_path = os.path.join(os.path.dirname(output_path), cached_name)
+                if os.path.exists(cached_path):
+                    shutil.copyfile(cached_path, output_path)
+                    log_info(f"✓ Reused cached preview for: {os.path.basename(stl_path)}")
+                    return 'cached', file_hash
+
+        # Load the mesh once for all methods; previews don't need the
+        # vertex merging/validation trimesh does by default. The mmap
+        # fast path handles well-formed STLs; anything odd falls back
+        # to the general loader.
+        try:
+            mesh = load_stl_fast(stl_path)
+        except Exception:
+            try:
+                mesh = trimesh.load_mesh(stl_path, process=False)
+            except Exception as e:
+                log_info(f"Failed to load mesh: {str(e)}")
+                log_info(f"❌ Could not load STL file: {os.path.basename(stl_path)}")
+                return 'failed', None
+
+        # A 512x512 preview gains nothing from more than ~20k faces
+        mesh = self._decimate(mesh, self.max_faces)
+
+        # Reorder faces so successive triangles share vertices; helps
+        # every per-face traversal downstream
+        try:
+            mesh.faces = reorder_faces(mesh.faces, len(mesh.vertices))
+        except Exception as e:
+            log_info(f"Face reordering failed ({str(e)}), keeping original order")
+
+        # Try each selected method in order; the strategy (and the face
+        # count, for auto) decides up front which ones are worth it
+        for name in self._select_methods(mesh):
+            method = getattr(self, f"generate_preview_{name}")
+            if method(mesh, stl_path, output_path):
+                log_info(f"✓ {name.capitalize()} preview generated successfully")
+                return 'success', file_hash
+
+        log_info(f"❌ All rendering methods failed for: {os.path.basename(stl_path)}")
+        return 'failed', None
+
+# Per-worker generator, created once by the pool initializer so each
+# process carries its own matplotlib/renderer state
+_worker_generator = None
+
+def _init_worker(image_size, cache_path, max_faces, image_format, strategy):
+    """Set up matplotlib and a preview generator in each worker process"""
+    global _worker_generator
+    plt.switch_backend('Agg')
+    _worker_generator = STLPreviewGenerator(image_size, cache_path=cache_path,
+                                           max_faces=max_faces,
+                                           image_format=image_format,
+                                           strategy=strategy)
+
+def _process_one(task):
+    """Generate one preview in a worker
+
+    Returns (status, content_hash, preview_basename) for aggregation.
+    """
+    stl_path, output_path = task
+    status, file_hash = _worker_generator.generate_preview(stl_path, output_path)
+    return status, file_hash, os.path.basename(output_path)
+
+def _scan_stl_tree(base_path):
+    """Walk the tree with os.scandir, returning STL paths and dir mtimes"""
     stl_files = []
+    dir_mtimes = {}
+    stack = [base_path]
+    while stack:
+        current = stack.pop()
+        try:
+            dir_mtimes[current] = os.stat(current).st_mtime
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith('.stl'):
+                        stl_files.append(entry.path)
+        except OSError:
+            continue
+    return stl_files, dir_mtimes
+
+def find_stl_files(base_path):
+    """Find all STL files recursively
+
+    Uses os.scandir (DirEntry carries cached type info, so no extra
+    stat per file) and keeps a .stl_index.json of directory mtimes in
+    the input tree; when no directory has changed since the last run
+    the cached file list is reused without walking at all.
+    """
+    index_path = os.path.join(base_path, '.stl_index.json')
     log_info(f"Scanning for STL files in: {base_path}")
-    
-    for root, _, files in os.walk(base_path):
-        for file in files:
-            if file.lower().endswith('.stl'):
-                stl_files.append(os.path.join(root, file))
-    
+
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+        dir_mtimes = index['dirs']
+        if dir_mtimes and all(os.stat(d).st_mtime == mtime
+                              for d, mtime in dir_mtimes.items()):
+            # Any added/removed/renamed entry bumps its directory's
+            # mtime, so matching mtimes mean the listing is current
+            log_info("Directory tree unchanged, using cached file list")
+            return index['files']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    # Create the index file before recording mtimes so our own write
+    # doesn't bump the root directory and invalidate the fresh index
+    try:
+        if not os.path.exists(index_path):
+            open(index_path, 'a').close()
+        index_writable = True
+    except OSError:
+        # Input tree may be read-only (e.g. a mounted volume); the
+        # index is purely an optimization
+        index_writable = False
+
+    stl_files, dir_mtimes = _scan_stl_tree(base_path)
+
+    if index_writable:
+        try:
+            with open(index_path, 'w') as f:
+                json.dump({'dirs': dir_mtimes, 'files': stl_files}, f)
+        except OSError:
+            pass
+
     return stl_files
 
-def main(input_dir, output_dir, image_size=(512, 512)):
+def main(input_dir, output_dir, image_size=(512, 512), max_faces=20000,
+         image_format='png', strategy='auto'):
     start_time = time.time()
-    
-    # Set matplotlib to use non-interactive backend
-    plt.switch_backend('Agg')
-    
+
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
-    
+
     # Find all STL files
     stl_files = find_stl_files(input_dir)
-    
+
     if not stl_files:
         log_info("No STL files found!")
         return
-    
+
     log_info(f"Found {len(stl_files)} STL files")
-    
-    # Initialize preview generator
-    generator = STLPreviewGenerator(image_size)
-    
-    # Process files with progress bar
-    with tqdm(total=len(stl_files), desc="Generating previews", 
-             unit="file", ncols=100) as pbar:
-        for stl_path in stl_files:
-            base_name = os.path.splitext(os.path.basename(stl_path))[0]
-            output_path = os.path.join(output_dir, f"{base_name}.png")
-            generator.generate_preview(stl_path, output_path)
-            pbar.update(1)
-    
+
+    # Build (stl_path, output_path) tasks up front
+    tasks = []
+    for stl_path in stl_files:
+        base_name = os.path.splitext(os.path.basename(stl_path))[0]
+        tasks.append((stl_path,
+                      os.path.join(output_dir, f"{base_name}.{image_format}")))
+
+    # Persistent content-hash cache so unchanged/duplicate STLs are not
+    # re-rendered across runs
+    cache_path = os.path.join(output_dir, '.preview_cache.json')
+    preview_cache = load_preview_cache(cache_path)
+
+    # Each file is independent, so fan the work out across all cores
+    counts = {'success': 0, 'failed': 0, 'skipped': 0, 'cached': 0}
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            initializer=_init_worker,
+            initargs=(image_size, cache_path, max_faces, image_format,
+                      strategy)) as executor:
+        results = executor.map(_process_one, tasks)
+        for status, file_hash, preview_name in tqdm(
+                results, total=len(tasks), desc="Generating previews",
+                unit="file", ncols=100):
+            counts[status] += 1
+            if file_hash is not None:
+                # Keep the existing entry while its preview survives so
+                # the cache stays pinned to a stable target instead of
+                # drifting to whichever duplicate rendered last
+                existing = preview_cache.get(file_hash)
+                if existing is None or not os.path.exists(
+                        os.path.join(output_dir, existing)):
+                    preview_cache[file_hash] = preview_name
+
+    # Persist the updated cache for the next run
+    try:
+        with open(cache_path, 'w') as f:
+            json.dump(preview_cache, f)
+    except OSError as e:
+        log_info(f"Could not write preview cache: {str(e)}")
+
     # Print summary
     elapsed_time = time.time() - start_time
     log_info("\nProcessing Summary:")
     log_info(f"Total files processed: {len(stl_files)}")
-    log_info(f"Successfully generated: {generator.success_count}")
-    log_info(f"Failed to generate   : {generator.failure_count}")
-    log_info(f"Skipped (existing)   : {generator.skipped_count}")
+    log_info(f"Successfully generated: {counts['success']}")
+    log_info(f"Failed to generate   : {counts['failed']}")
+    log_info(f"Skipped (existing)   : {counts['skipped']}")
+    log_info(f"Reused from cache    : {counts['cached']}")
     log_info(f"Time taken          : {elapsed_time:.2f} seconds")
-    
-    if generator.failure_count > 0:
+
+    if counts['failed'] > 0:
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -263,6 +694,17 @@ if __name__ == "__main__":
     parser.add_argument("output_dir", help="Directory to save PNG previews")
     parser.add_argument("--size", type=int, nargs=2, default=[512, 512],
                       help="Image size in pixels (width height)")
-    
+    parser.add_argument("--max-faces", type=int, default=20000,
+                      help="Decimate meshes above this face count before "
+                           "rendering (0 disables decimation)")
+    parser.add_argument("--format", choices=["png", "webp"], default="png",
+                      help="Output image format (webp encodes faster and "
+                           "produces smaller previews)")
+    parser.add_argument("--strategy", choices=["auto", "3d", "wire", "simple"],
+                      default="auto",
+                      help="Rendering strategy: auto picks per mesh by face "
+                           "count, the others force one method family")
+
     args = parser.parse_args()
-    main(args.input_dir, args.output_dir, tuple(args.size))
\ No newline at end of file
+    main(args.input_dir, args.output_dir, tuple(args.size), args.max_faces,
+         args.format, args.strategy)
\ No newline at end of file